@@ -3,6 +3,7 @@ import os
 from datetime import datetime, timedelta
 
 import matplotlib.pyplot as plt
+import numpy as np
 
 path = "result.json"
 days_per_period = 30
@@ -12,9 +13,9 @@ with open(path, 'r', encoding='utf-8') as file:
 messages = data["messages"]
 print(f"час с {data["name"]}")
 
-from collections import defaultdict
+from collections import Counter
 
-message_count = defaultdict(int)
+message_count = Counter()
 
 not_message = 0
 
@@ -32,76 +33,72 @@ print(f'не обработано {not_message} сообщений ')
 
 
 def parse_date(date_str):
-    return datetime.strptime(date_str, "%Y-%m-%dT%H:%M:%S")
+    return datetime.fromisoformat(date_str)
 
 
 def count_words(text):
     if isinstance(text, list):
-        text = ' '.join(item['text'] if isinstance(item, dict) else item for item in text)
+        # считаем по кускам, не склеивая весь текст в одну строку
+        return sum(len((item['text'] if isinstance(item, dict) else item).split()) for item in text)
     return len(text.split())
 
 
-messages_sorted = sorted(messages, key=lambda x: parse_date(x['date']))
+# Telegram выгружает сообщения по порядку, сортируем только если это не так.
+# Даты в формате ISO, поэтому строки сравниваются так же, как сами даты
+messages_sorted = messages
+if not all(messages[i]['date'] <= messages[i + 1]['date'] for i in range(len(messages) - 1)):
+    messages_sorted = sorted(messages, key=lambda x: x['date'])
 start_date = parse_date(messages_sorted[0]['date'])
-periods = []
-period_counts = []
-
-current_period = []
-current_period_end = start_date + timedelta(days=days_per_period)
+# счетчики по ключу (номер периода, отправитель)
+period_messages = Counter()
+period_words = Counter()
+period_total = 0
 unrecognized_voice_count = 0
 
 for message in messages_sorted:
-    message_date = parse_date(message['date'])
-
-    if message_date < current_period_end:
-        current_period.append(message)
-    else:
-        periods.append(current_period)
-        period_count = defaultdict(lambda: {'messages': 0, 'words': 0})
-        for msg in current_period:
-            try:
-                sender = msg['from']
-                period_count[sender]['messages'] += 1
-                if msg.get("media_type") == "voice_message":
-                    # это голосовое сообщение
-                    voice_path = msg['file'].replace("voice_messages", "voice_messages_txt").replace(".ogg", ".txt")
-                    if os.path.isfile(voice_path):
-                        with open(voice_path, 'r', encoding='utf-8') as file:
-                            voice_content = file.read()
-                        period_count[sender]['words'] += count_words(voice_content)
-                    else:
-                        unrecognized_voice_count += 1
-                else:
-                    # это обычное сообщение
-                    period_count[sender]['words'] += count_words(msg['text'])
-            except KeyError:
-                pass
-
-        period_counts.append(period_count)
-        current_period = [message]
-        current_period_end = current_period_end + timedelta(days=days_per_period)
+    # номер периода считаем сразу, без буфера сообщений текущего периода
+    period_index = (parse_date(message['date']) - start_date).days // days_per_period
+    period_total = max(period_total, period_index + 1)
+    try:
+        sender = message['from']
+        period_messages[period_index, sender] += 1
+        if message.get("media_type") == "voice_message":
+            # это голосовое сообщение
+            voice_path = message['file'].replace("voice_messages", "voice_messages_txt").replace(".ogg", ".txt")
+            if os.path.isfile(voice_path):
+                with open(voice_path, 'r', encoding='utf-8') as file:
+                    voice_content = file.read()
+                period_words[period_index, sender] += count_words(voice_content)
+            else:
+                unrecognized_voice_count += 1
+        else:
+            # это обычное сообщение
+            period_words[period_index, sender] += count_words(message['text'])
+    except KeyError:
+        pass
 
 print(f"проигнорировано {unrecognized_voice_count} голосовых")
-period_labels = [start_date + timedelta(days=days_per_period * i) for i in range(len(period_counts))]
+period_labels = [start_date + timedelta(days=days_per_period * i) for i in range(period_total)]
 
-users = set()
-for period_count in period_counts:
-    users.update(period_count.keys())
+# все отправители уже собраны при первом проходе по сообщениям
+users = sorted(message_count, key=str)
+user_index = {user: i for i, user in enumerate(users)}
 
-data_messages = {user: [] for user in users}
-data_words = {user: [] for user in users}
-for period_count in period_counts:
-    for user in users:
-        data_messages[user].append(period_count.get(user, {}).get('messages', 0))
-        data_words[user].append(period_count.get(user, {}).get('words', 0))
+# строка на пользователя, столбец на период
+data_messages = np.zeros((len(users), period_total), dtype=np.int32)
+data_words = np.zeros((len(users), period_total), dtype=np.int32)
+for (period_index, user), count in period_messages.items():
+    data_messages[user_index[user], period_index] = count
+for (period_index, user), count in period_words.items():
+    data_words[user_index[user], period_index] = count
 
 plt.figure(figsize=(12, 6))
 
-for user, counts in data_messages.items():
-    plt.plot(period_labels, counts, label=f'{user} - Сообщения', marker='o')
+for i, user in enumerate(users):
+    plt.plot(period_labels, data_messages[i], label=f'{user} - Сообщения', marker='o')
 
-for user, counts in data_words.items():
-    plt.plot(period_labels, counts, label=f'{user} - Слова', linestyle='--', marker='.')
+for i, user in enumerate(users):
+    plt.plot(period_labels, data_words[i], label=f'{user} - Слова', linestyle='--', marker='.')
 
 plt.xticks(period_labels, [date.strftime('%Y-%m-%d') for date in period_labels], rotation=45)
 
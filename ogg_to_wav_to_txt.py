@@ -2,6 +2,7 @@ import gzip
 import os
 import shutil
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 
 import speech_recognition as sr
 
@@ -31,48 +32,72 @@ if not os.path.isfile("ffmpeg.exe"):
 def convert_ogg_to_wav(ogg_file, wav_file):
     ffmpeg_path = r"ffmpeg.exe"
     command = [ffmpeg_path, "-i", ogg_file, wav_file]
-    subprocess.run(command, shell=True)
+    subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
 
 
-# Конвертируем .ogg в .wav
+def convert_pair(pair):
+    input_file_path, output_file_path = pair
+    try:
+        convert_ogg_to_wav(input_file_path, output_file_path)
+        print(f'Converted {input_file_path} to {output_file_path}')
+    except Exception as e:
+        print(f"Error converting {input_file_path}: {e}")
+
+
+# Собираем список файлов, которые нужно перевести в .wav
+pairs = []
 for filename in os.listdir(input_folder):
     if os.path.isfile(f"voice_messages_wav/{filename.replace("ogg", "wav")}"):
         print(f"файл {filename} уже переведен в wav")
     elif filename.endswith('.ogg'):
         input_file_path = os.path.join(input_folder, filename)
-        try:
-            output_file_path = os.path.join(output_folder, os.path.splitext(filename)[0] + '.wav')
-            convert_ogg_to_wav(input_file_path, output_file_path)
-            print(f'Converted {input_file_path} to {output_file_path}')
-        except Exception as e:
-            print(f"Error converting {input_file_path}: {e}")
-            continue
-
-# Обработка .wav файлов для распознавания речи
-r = sr.Recognizer()
+        output_file_path = os.path.join(output_folder, os.path.splitext(filename)[0] + '.wav')
+        pairs.append((input_file_path, output_file_path))
+
+# Конвертируем .ogg в .wav параллельно, ffmpeg однопоточный на файл
+with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+    list(executor.map(convert_pair, pairs))
+
+# Сколько запросов к Google Speech Recognition выполнять одновременно
+recognize_workers = 8
+
+
+def recognize_wav(pair):
+    wav_file_path, text_file_path = pair
+    filename = os.path.basename(wav_file_path)
+    # Recognizer хранит состояние, поэтому у каждой задачи свой
+    r = sr.Recognizer()
+    with sr.AudioFile(wav_file_path) as source:
+        audio_data = r.record(source)  # Читаем весь файл
+
+    # Распознаем речь с помощью Google Speech Recognition
+    try:
+        recognized_text = r.recognize_google(audio_data, language="ru-RU")
+        print(f"Recognized text for {filename}: {recognized_text}")
+
+        # Сохраняем распознанный текст в файл .txt
+        with open(text_file_path, 'w', encoding='utf-8') as text_file:
+            text_file.write(recognized_text)
+
+        print(f"Saved recognized text to {text_file_path}")
+    except sr.UnknownValueError:
+        print(f"Google Speech Recognition could not understand {filename}")
+    except sr.RequestError as e:
+        print(f"Google Speech Recognition error for {filename}: {e}")
+
+
+# Собираем список .wav файлов для распознавания речи
+wav_pairs = []
 for filename in os.listdir(output_folder):
     if os.path.isfile(f"voice_messages_txt/{filename.replace("wav", "txt")}"):
         print(f"файл {filename} уже обработан")
     elif filename.endswith('.wav'):
         wav_file_path = os.path.join(output_folder, filename)
         text_file_path = os.path.join(text_folder, os.path.splitext(filename)[0] + '.txt')
+        wav_pairs.append((wav_file_path, text_file_path))
 
-        with sr.AudioFile(wav_file_path) as source:
-            audio_data = r.record(source)  # Читаем весь файл
-
-        # Распознаем речь с помощью Google Speech Recognition
-        try:
-            recognized_text = r.recognize_google(audio_data, language="ru-RU")
-            print(f"Recognized text for {filename}: {recognized_text}")
-
-            # Сохраняем распознанный текст в файл .txt
-            with open(text_file_path, 'w', encoding='utf-8') as text_file:
-                text_file.write(recognized_text)
-
-            print(f"Saved recognized text to {text_file_path}")
-        except sr.UnknownValueError:
-            print(f"Google Speech Recognition could not understand {filename}")
-        except sr.RequestError as e:
-            print(f"Google Speech Recognition error for {filename}: {e}")
+# Распознаем параллельно, запросы к Google упираются в сеть, а не в процессор
+with ThreadPoolExecutor(max_workers=recognize_workers) as executor:
+    list(executor.map(recognize_wav, wav_pairs))
 
 print('All files processed.')